@@ -1,3 +1,5 @@
+import heapq
+import io
 import json
 import logging
 import logging.handlers
@@ -8,17 +10,19 @@ import signal
 import sys
 import threading
 import time
-from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import yaml
 from dotenv import load_dotenv
-from strands import Agent
-from strands.agent.conversation_manager import SlidingWindowConversationManager
-from strands.models.anthropic import AnthropicModel
-from strands.session import FileSessionManager
-from tools import TOOL_REGISTRY
+
+# strands, anthropic and yaml take a while to import, so they are imported
+# where they are first needed rather than at startup
+if TYPE_CHECKING:
+    from strands import Agent
 
 load_dotenv()
 
@@ -28,60 +32,234 @@ shutdown_requested = False
 DEFAULT_MODEL = "claude-sonnet-4-20250514"
 DEFAULT_MAX_TOKENS = 4096
 
+# Timestamp format for log lines
+LOG_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Longest partial line LoggerWriter buffers before forcing it out
+MAX_LOG_LINE_LENGTH = 1_048_576
+
+# Write buffer for agent log files; flushed whenever the log queue drains
+AGENT_LOG_BUFFER_SIZE = 65536
+
 # Main application logger (stdout)
 logger = logging.getLogger("snake")
 
+# Duration strings like "30m", "24h", "1d", "1w" and their unit sizes in seconds
+_DURATION_RE = re.compile(r'^(\d+)\s*([mhdw])$')
+_DURATION_MULTIPLIERS = {
+    'm': 60,           # minutes
+    'h': 3600,         # hours
+    'd': 86400,        # days
+    'w': 604800,       # weeks
+}
+
+# Background listeners writing agent log records to disk
+_agent_log_listeners: list[logging.handlers.QueueListener] = []
+
+# Parsed agent definitions keyed by file path, with the file's mtime (ns)
+_definition_cache: dict[Path, tuple[int, dict]] = {}
+
+# Definition and period each agent's current system prompt was rendered from
+_system_prompt_sources: dict[str, tuple[dict, int]] = {}
+
 
 def setup_logging() -> None:
     """Configure the main application logger to write to stdout."""
     handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%dT%H:%M:%S"))
+    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt=LOG_DATE_FORMAT))
     logger.addHandler(handler)
     logger.setLevel(logging.INFO)
 
 
+class AgentLogFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Daily rotating handler for agent log files.
+
+    The stdlib handler also checks that the log path is still a regular file
+    before rolling over. Agent log files are created by this process, so the
+    check is skipped and rollover depends on the time alone.
+
+    The file is opened with a large write buffer, and the per-record flush
+    done by StreamHandler is skipped. AgentLogListener calls flush_buffer()
+    once its queue is empty, so a burst of output costs one write instead of
+    one per line.
+    """
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return int(time.time()) >= self.rolloverAt
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=AGENT_LOG_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+
+    def flush(self) -> None:
+        pass
+
+    def flush_buffer(self) -> None:
+        super().flush()
+
+
+class AgentLogListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue runs empty."""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush_buffer()
+
+
 def setup_agent_logger(name: str, log_dir: Path) -> logging.Logger:
     """Create a per-agent logger with daily file rotation.
 
     Each agent gets its own logger writing to log_dir/<name>.log,
-    rotating at midnight and keeping 30 days of history.
+    rotating at midnight and keeping 30 days of history. Records are passed
+    through a queue to a background listener thread, so agents never block
+    on disk I/O while logging.
     """
     agent_logger = logging.getLogger(f"snake.agent.{name}")
     agent_logger.setLevel(logging.INFO)
     agent_logger.propagate = False
 
-    handler = logging.handlers.TimedRotatingFileHandler(
+    file_handler = AgentLogFileHandler(
         log_dir / f"{name}.log",
         when="midnight",
         backupCount=30,
         encoding="utf-8",
     )
-    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%dT%H:%M:%S"))
-    agent_logger.addHandler(handler)
+    file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt=LOG_DATE_FORMAT))
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+    agent_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = AgentLogListener(log_queue, file_handler)
+    listener.start()
+    _agent_log_listeners.append(listener)
     return agent_logger
 
 
+def stop_agent_loggers() -> None:
+    """Write out pending agent log records and stop the listener threads."""
+    for listener in _agent_log_listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    _agent_log_listeners.clear()
+
+
 class LoggerWriter:
-    """File-like object that redirects writes to a logger."""
+    """File-like object that redirects writes to a logger.
+
+    A line that grows past MAX_LOG_LINE_LENGTH without a newline is logged
+    truncated and then discarded, so malformed output can't grow the buffer
+    without bound.
+    """
 
     def __init__(self, log: logging.Logger):
         self._logger = log
-        self._buf = ""
+        self._buf = io.StringIO()
 
     def write(self, msg: str) -> int:
         if not msg:
             return 0
-        self._buf += msg
-        while "\n" in self._buf:
-            line, self._buf = self._buf.split("\n", 1)
+        if "\n" not in msg:
+            self._buf.write(msg)
+            self._check_size()
+            return len(msg)
+        # Emit every complete line and keep only the trailing partial line
+        head, tail = msg.rsplit("\n", 1)
+        self._buf.write(head)
+        lines = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        self._buf.write(tail)
+        for line in lines.split("\n"):
             if line:
                 self._logger.info("%s", line)
+        self._check_size()
         return len(msg)
 
     def flush(self) -> None:
-        if self._buf:
-            self._logger.info("%s", self._buf)
-            self._buf = ""
+        if self._buf.tell():
+            self._logger.info("%s", self._buf.getvalue())
+            self._buf.seek(0)
+            self._buf.truncate()
+
+    def _check_size(self) -> None:
+        if self._buf.tell() > MAX_LOG_LINE_LENGTH:
+            self._logger.info("%s [truncated]", self._buf.getvalue()[:MAX_LOG_LINE_LENGTH])
+            self._buf.seek(0)
+            self._buf.truncate()
+
+
+# Writer for the agent running in the current context. stdout/stderr writes
+# are routed here, so concurrent agents each log to their own file.
+current_agent_writer: ContextVar[LoggerWriter | None] = ContextVar("current_agent_writer", default=None)
+
+
+class OutputRouter:
+    """stdout/stderr replacement that routes writes to the current agent's writer.
+
+    Writes made outside of an agent run go to the original stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, msg: str) -> int:
+        writer = current_agent_writer.get()
+        if writer is None:
+            return self._stream.write(msg)
+        return writer.write(msg)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class TriggerQueue:
+    """Queue of agent names waiting to run, holding each name at most once.
+
+    Repeated triggers for an agent that is already pending collapse into a
+    single run, so a burst of webhook calls does not queue a burst of runs.
+    """
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def put(self, name: str) -> bool:
+        """Queue an agent name. Returns False if it was already pending."""
+        with self._lock:
+            if name in self._pending:
+                return False
+            self._pending.add(name)
+        self._queue.put(name)
+        return True
+
+    def wakeup(self) -> None:
+        """Unblock a waiting get() without queueing an agent.
+
+        Only uses SimpleQueue.put, which is reentrant and therefore safe to
+        call from a signal handler.
+        """
+        self._queue.put(None)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> str | None:
+        """Take the next agent name, or None for a wakeup.
+
+        Raises queue.Empty if nothing is available (within the timeout).
+        """
+        name = self._queue.get(block=block, timeout=timeout)
+        if name is not None:
+            with self._lock:
+                self._pending.discard(name)
+        return name
+
+
+# Agents triggered via webhook, also used to wake the scheduler loop
+webhook_queue = TriggerQueue()
 
 
 def signal_handler(signum, frame):
@@ -89,6 +267,7 @@ def signal_handler(signum, frame):
     global shutdown_requested
     logger.info("Received signal %s, shutting down gracefully...", signum)
     shutdown_requested = True
+    webhook_queue.wakeup()
 
 
 def parse_duration(duration_str: str) -> int:
@@ -105,7 +284,7 @@ def parse_duration(duration_str: str) -> int:
     """
     duration_str = duration_str.strip().lower()
 
-    match = re.match(r'^(\d+)\s*([mhdw])$', duration_str)
+    match = _DURATION_RE.match(duration_str)
     if not match:
         raise ValueError(
             f"Invalid duration format: '{duration_str}'. "
@@ -115,14 +294,7 @@ def parse_duration(duration_str: str) -> int:
     value = int(match.group(1))
     unit = match.group(2)
 
-    multipliers = {
-        'm': 60,           # minutes
-        'h': 3600,         # hours
-        'd': 86400,        # days
-        'w': 604800,       # weeks
-    }
-
-    return value * multipliers[unit]
+    return value * _DURATION_MULTIPLIERS[unit]
 
 
 def parse_agents_config(agents_str: str) -> list[dict]:
@@ -160,7 +332,7 @@ def parse_agents_config(agents_str: str) -> list[dict]:
             })
         else:
             interval_seconds = parse_duration(frequency)
-            period_minutes = int((interval_seconds / 60) * 1.1)
+            period_minutes = (interval_seconds * 11) // 600
             agents.append({
                 "name": name,
                 "frequency": frequency,
@@ -170,6 +342,41 @@ def parse_agents_config(agents_str: str) -> list[dict]:
     return agents
 
 
+@dataclass(frozen=True)
+class SnakeConfig:
+    """Runtime configuration, read from the environment once at startup."""
+
+    agents: tuple[dict, ...]
+    agents_dir: Path
+    log_dir: Path
+    sessions_dir: Path
+    context_window_size: int
+    max_tool_output_tokens: int
+    webhook_port: int
+    max_concurrent_agents: int
+
+    @classmethod
+    def from_env(cls) -> "SnakeConfig":
+        """Build the configuration from SNAKE_* environment variables.
+
+        Raises ValueError if SNAKE_AGENTS or a numeric setting is invalid.
+        """
+        max_concurrent_agents = int(os.getenv("SNAKE_MAX_CONCURRENT_AGENTS", "4"))
+        if max_concurrent_agents < 1:
+            raise ValueError(f"SNAKE_MAX_CONCURRENT_AGENTS must be at least 1, got {max_concurrent_agents}")
+
+        return cls(
+            agents=tuple(parse_agents_config(os.getenv("SNAKE_AGENTS", "operational-report:24h"))),
+            agents_dir=Path(os.getenv("SNAKE_AGENTS_DIR", "./agents")),
+            log_dir=Path(os.getenv("SNAKE_AGENT_LOG_DIR", os.getenv("LOG_DIR", "./logs"))),
+            sessions_dir=Path(os.getenv("SNAKE_SESSIONS_DIR", "./sessions")),
+            context_window_size=int(os.getenv("SNAKE_CONTEXT_WINDOW_SIZE", "20")),
+            max_tool_output_tokens=int(os.getenv("SNAKE_MAX_TOOL_OUTPUT_TOKENS", "50000")),
+            webhook_port=int(os.getenv("SNAKE_WEBHOOK_PORT", "8000")),
+            max_concurrent_agents=max_concurrent_agents,
+        )
+
+
 def load_agent_definition(name: str, agents_dir: Path) -> dict:
     """
     Load an agent definition from a markdown file.
@@ -178,11 +385,23 @@ def load_agent_definition(name: str, agents_dir: Path) -> dict:
     prompt template. Template variables {period_hours} and {period_minutes}
     are substituted at runtime.
 
+    Parsed definitions are cached and only re-read when the file's mtime
+    changes, so hot-reloading still works without parsing on every run.
+
     Returns a dict with keys: tools, model, max_tokens, prompt_template
     """
     filepath = agents_dir / f"{name}.md"
-    if not filepath.exists():
-        raise FileNotFoundError(f"Agent definition not found: {filepath}")
+    try:
+        mtime_ns = filepath.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Agent definition not found: {filepath}") from None
+
+    cached = _definition_cache.get(filepath)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    import yaml
+    from tools import TOOL_REGISTRY
 
     content = filepath.read_text()
 
@@ -190,12 +409,18 @@ def load_agent_definition(name: str, agents_dir: Path) -> dict:
     if not content.startswith("---"):
         raise ValueError(f"Agent definition {filepath} must start with YAML frontmatter (---)")
 
-    parts = content.split("---", 2)
-    if len(parts) < 3:
+    # Frontmatter starts after the opening "---" line and ends at the next
+    # line starting with "---"; searching from the opening line's newline
+    # also accepts an empty frontmatter block
+    start = content.find("\n", 3) + 1
+    end = content.find("\n---", start - 1) if start else -1
+    if end == -1:
         raise ValueError(f"Agent definition {filepath} has invalid frontmatter format")
 
-    frontmatter = yaml.safe_load(parts[1])
-    prompt_template = parts[2].strip()
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    frontmatter = yaml.load(content[start:end], Loader=loader) or {}
+    prompt_template = content[end + 4:].strip()
 
     tool_names = frontmatter.get("tools", [])
     tools = []
@@ -204,15 +429,17 @@ def load_agent_definition(name: str, agents_dir: Path) -> dict:
             raise ValueError(f"Unknown tool '{tool_name}' in agent '{name}'. Available: {list(TOOL_REGISTRY.keys())}")
         tools.append(TOOL_REGISTRY[tool_name])
 
-    return {
+    definition = {
         "tools": tools,
         "model": frontmatter.get("model", DEFAULT_MODEL),
         "max_tokens": frontmatter.get("max_tokens", DEFAULT_MAX_TOKENS),
         "prompt_template": prompt_template,
     }
+    _definition_cache[filepath] = (mtime_ns, definition)
+    return definition
 
 
-def create_agent(name: str, agents_dir: Path, period_minutes: int, sessions_dir: Path) -> tuple[Agent, dict] | None:
+def create_agent(name: str, period_minutes: int, config: SnakeConfig) -> tuple["Agent", dict] | None:
     """Create a persistent agent instance from its definition file.
 
     Uses FileSessionManager to persist conversation history to disk so it
@@ -220,25 +447,34 @@ def create_agent(name: str, agents_dir: Path, period_minutes: int, sessions_dir:
 
     Returns a tuple of (Agent, definition_dict) or None if loading fails.
     """
+    from strands import Agent
+    from strands.session import FileSessionManager
+    from strands_ext import CachingAnthropicModel, SnakeConversationManager
+
     try:
-        definition = load_agent_definition(name, agents_dir)
+        definition = load_agent_definition(name, config.agents_dir)
     except (FileNotFoundError, ValueError) as e:
         logger.error("Failed to load agent '%s': %s", name, e)
         return None
 
-    period_hours = max(1, int((period_minutes + 59) / 60))
+    period_hours = max(1, (period_minutes + 59) // 60)
     system_prompt = definition["prompt_template"].format(
         period_hours=period_hours,
         period_minutes=period_minutes,
     )
 
-    model = AnthropicModel(model_id=definition["model"], max_tokens=definition["max_tokens"])
+    # Each agent owns its model and Anthropic client. strands runs every call
+    # on its own event loop, and the client's async connection pool must not
+    # be shared between agents running concurrently on different loops.
+    model = CachingAnthropicModel(model_id=definition["model"], max_tokens=definition["max_tokens"])
     session_manager = FileSessionManager(
         session_id=f"snake-{name}",
-        storage_dir=str(sessions_dir),
+        storage_dir=str(config.sessions_dir),
+    )
+    conversation_manager = SnakeConversationManager(
+        window_size=config.context_window_size,
+        max_tool_output_tokens=config.max_tool_output_tokens,
     )
-    window_size = int(os.environ.get("SNAKE_CONTEXT_WINDOW_SIZE", "20"))
-    conversation_manager = SlidingWindowConversationManager(window_size=window_size)
     agent = Agent(
         model=model,
         tools=definition["tools"],
@@ -248,14 +484,19 @@ def create_agent(name: str, agents_dir: Path, period_minutes: int, sessions_dir:
         agent_id=name,
     )
 
-    logger.info("Created persistent agent '%s' (session: %s)", name, sessions_dir)
+    _system_prompt_sources[name] = (definition, period_minutes)
+
+    logger.info("Created persistent agent '%s' (session: %s)", name, config.sessions_dir)
     return agent, definition
 
 
-def refresh_agent_system_prompt(agent: Agent, name: str, agents_dir: Path, period_minutes: int) -> None:
+def refresh_agent_system_prompt(agent: "Agent", name: str, agents_dir: Path, period_minutes: int) -> None:
     """Reload the agent definition from disk and update the system prompt.
 
     This allows hot-reloading prompt changes without losing conversation history.
+    The prompt is left untouched when neither the definition file nor the
+    period has changed since it was last rendered, or when re-rendering it
+    gives the same text.
     """
     try:
         definition = load_agent_definition(name, agents_dir)
@@ -263,37 +504,49 @@ def refresh_agent_system_prompt(agent: Agent, name: str, agents_dir: Path, perio
         logger.error("Failed to reload agent '%s': %s", name, e)
         return
 
-    period_hours = max(1, int((period_minutes + 59) / 60))
-    agent.system_prompt = definition["prompt_template"].format(
+    # Cached definitions are only replaced when the file's mtime changes
+    source = _system_prompt_sources.get(name)
+    if source is not None and source[0] is definition and source[1] == period_minutes:
+        return
+
+    period_hours = max(1, (period_minutes + 59) // 60)
+    system_prompt = definition["prompt_template"].format(
         period_hours=period_hours,
         period_minutes=period_minutes,
     )
+    # A touched file or a frontmatter-only edit renders the same prompt
+    if system_prompt != agent.system_prompt:
+        agent.system_prompt = system_prompt
+    _system_prompt_sources[name] = (definition, period_minutes)
 
 
-def run_agent(agent: Agent, name: str, agents_dir: Path, period_minutes: int,
-              log_dir: Path, agent_loggers: dict[str, logging.Logger]) -> None:
+def run_agent(agent: "Agent", name: str, period_minutes: int, config: SnakeConfig,
+              agent_loggers: dict[str, logging.Logger]) -> None:
     """Run a single analysis cycle on a persistent agent instance."""
     logger.info("Running agent '%s'...", name)
 
     # Reload system prompt from disk to pick up any changes
-    refresh_agent_system_prompt(agent, name, agents_dir, period_minutes)
+    refresh_agent_system_prompt(agent, name, config.agents_dir, period_minutes)
 
     agent_log = agent_loggers[name]
     agent_log.info("=" * 80)
     agent_log.info("Run started")
     agent_log.info("=" * 80)
 
+    from tools import current_log_cache
+
     try:
         writer = LoggerWriter(agent_log)
-        old_stdout, old_stderr = sys.stdout, sys.stderr
-        sys.stdout = writer
-        sys.stderr = writer
+        token = current_agent_writer.set(writer)
+        # Repeated log queries are cached for this run only, so the next run
+        # (e.g. a webhook re-run for a new chat message) sees fresh logs
+        cache_token = current_log_cache.set({})
         try:
             result = agent("Run your analysis cycle now.")
         finally:
             writer.flush()
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
+            current_log_cache.reset(cache_token)
+            current_agent_writer.reset(token)
 
         usage = result.metrics.accumulated_usage
         token_parts = [
@@ -310,48 +563,111 @@ def run_agent(agent: Agent, name: str, agents_dir: Path, period_minutes: int,
         logger.error("Agent '%s' failed: %s", name, e)
 
 
+def submit_agent(executor: ThreadPoolExecutor, in_flight: dict[str, Future], agent: "Agent", name: str,
+                 period_minutes: int, config: SnakeConfig, agent_loggers: dict[str, logging.Logger]) -> bool:
+    """Submit an agent run to the executor unless that agent is still running.
+
+    Different agents run concurrently, but a single agent never overlaps with
+    itself (its session and conversation history are not safe to share).
+
+    Returns True if the run was submitted, False if the agent is still running.
+    """
+    future = in_flight.get(name)
+    if future is not None and not future.done():
+        return False
+    future = executor.submit(run_agent, agent, name, period_minutes, config, agent_loggers)
+    # Wake the scheduler when the run ends so deferred triggers can run
+    future.add_done_callback(lambda _: webhook_queue.wakeup())
+    in_flight[name] = future
+    return True
+
+
+# Webhook request bodies are not used; at most this much is read and discarded
+MAX_WEBHOOK_BODY_SIZE = 4096
+
+# Seconds a webhook client may stall on its socket before the handler gives up
+WEBHOOK_SOCKET_TIMEOUT = 5
+
+# Pre-encoded static webhook responses
+_NOT_FOUND_BODY = json.dumps({"error": "not found"}).encode()
+_METHOD_NOT_ALLOWED_BODY = json.dumps({"error": "method not allowed, use POST"}).encode()
+
+
 class WebhookHandler(BaseHTTPRequestHandler):
     """HTTP handler for agent webhook triggers.
 
     Accepts POST /agents/<agent-name> and queues the agent for execution.
+    start_webhook_server() binds the class attributes below on a subclass.
     """
 
+    valid_agents: frozenset[str] = frozenset()
+    webhook_queue: TriggerQueue
+    accepted_bodies: dict[str, bytes] = {}
+    # Applied to the connection socket by StreamRequestHandler, so a client
+    # that announces a body and never sends it can't pin the handler thread
+    timeout = WEBHOOK_SOCKET_TIMEOUT
+
     def do_POST(self):
         parts = self.path.strip("/").split("/")
         if len(parts) == 2 and parts[0] == "agents":
             agent_name = parts[1]
-            if agent_name in self.server.valid_agents:
-                self.server.webhook_queue.put(agent_name)
-                self.send_response(202)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"status": "accepted", "agent": agent_name}).encode())
+            if agent_name in self.valid_agents:
+                # Queue before touching the body so a stalled client can't delay the run
+                self.webhook_queue.put(agent_name)
+                status, body = 202, self.accepted_bodies[agent_name]
             else:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": f"agent '{agent_name}' not found"}).encode())
+                status, body = 404, json.dumps({"error": f"agent '{agent_name}' not found"}).encode()
         else:
-            self.send_response(404)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "not found"}).encode())
+            status, body = 404, _NOT_FOUND_BODY
+        self._discard_body()
+        self._send_json(status, body)
 
     def do_GET(self):
-        self.send_response(405)
+        self._send_json(405, _METHOD_NOT_ALLOWED_BODY)
+
+    def _send_json(self, status: int, body: bytes) -> None:
+        """Send a complete JSON response.
+
+        Headers are buffered by send_header() and written together by
+        end_headers(), so a response costs two writes: headers, then body.
+        """
+        self.send_response(status)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps({"error": "method not allowed, use POST"}).encode())
+        self.wfile.write(body)
+
+    def _discard_body(self) -> None:
+        """Read and drop the request body so the client isn't left mid-send."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return
+        if length > 0:
+            try:
+                self.rfile.read(min(length, MAX_WEBHOOK_BODY_SIZE))
+            except OSError:  # includes the socket timeout
+                self.close_connection = True
 
     def log_message(self, format, *args):
-        logger.info("Webhook: %s", format % args)
+        logger.info("Webhook: " + format, *args)
+
 
+def start_webhook_server(port: int, valid_agents: set[str], webhook_queue: TriggerQueue) -> ThreadingHTTPServer:
+    """Start the webhook HTTP server in a daemon thread.
 
-def start_webhook_server(port: int, valid_agents: set[str], webhook_queue: queue.Queue) -> HTTPServer:
-    """Start the webhook HTTP server in a daemon thread."""
-    server = HTTPServer(("0.0.0.0", port), WebhookHandler)
-    server.valid_agents = valid_agents
-    server.webhook_queue = webhook_queue
+    Each request is handled in its own thread, so a slow client cannot hold
+    up other webhook calls.
+    """
+    handler = type("WebhookHandler", (WebhookHandler,), {
+        "valid_agents": frozenset(valid_agents),
+        "webhook_queue": webhook_queue,
+        "accepted_bodies": {
+            name: json.dumps({"status": "accepted", "agent": name}).encode()
+            for name in valid_agents
+        },
+    })
+    server = ThreadingHTTPServer(("0.0.0.0", port), handler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     logger.info("Webhook server listening on 0.0.0.0:%s", port)
@@ -361,39 +677,40 @@ def start_webhook_server(port: int, valid_agents: set[str], webhook_queue: queue
 def main():
     setup_logging()
 
+    # Route agent output (printed by strands) to per-agent log files
+    sys.stdout = OutputRouter(sys.stdout)
+    sys.stderr = OutputRouter(sys.stderr)
+
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
 
-    # Parse agent list with per-agent frequencies
-    agents_str = os.getenv("SNAKE_AGENTS", "operational-report:24h")
+    # Read configuration once, including the agent list with per-agent frequencies
     try:
-        agents_config = parse_agents_config(agents_str)
+        config = SnakeConfig.from_env()
     except ValueError as e:
         logger.error("Error: %s", e)
         return 1
+    agents_config = config.agents
 
     if not agents_config:
         logger.error("SNAKE_AGENTS is empty. Set it to 'name:frequency' pairs (e.g., 'operational-report:1h,admin-chatbot:10m').")
         return 1
 
-    agents_dir = Path(os.getenv("SNAKE_AGENTS_DIR", "./agents"))
-    if not agents_dir.is_dir():
-        logger.error("Agents directory not found: %s", agents_dir)
+    if not config.agents_dir.is_dir():
+        logger.error("Agents directory not found: %s", config.agents_dir)
         return 1
 
     # Set up log directory for agent output
-    log_dir = Path(os.getenv("SNAKE_AGENT_LOG_DIR", os.getenv("LOG_DIR", "./logs")))
-    log_dir.mkdir(parents=True, exist_ok=True)
+    config.log_dir.mkdir(parents=True, exist_ok=True)
 
     # Set up sessions directory for persistent conversation history
-    sessions_dir = Path(os.getenv("SNAKE_SESSIONS_DIR", "./sessions"))
-    sessions_dir.mkdir(parents=True, exist_ok=True)
+    config.sessions_dir.mkdir(parents=True, exist_ok=True)
 
     logger.info("Snake starting...")
-    logger.info("Agents directory: %s", agents_dir)
-    logger.info("Sessions directory: %s", sessions_dir)
-    logger.info("Agent log directory: %s", log_dir)
+    logger.info("Agents directory: %s", config.agents_dir)
+    logger.info("Sessions directory: %s", config.sessions_dir)
+    logger.info("Agent log directory: %s", config.log_dir)
     for ac in agents_config:
         if ac["frequency"] == "webhook":
             logger.info("  Agent '%s': webhook-triggered, query period: %sm", ac["name"], ac["period_minutes"])
@@ -401,11 +718,12 @@ def main():
             logger.info("  Agent '%s': every %s (%ss), query period: %sm", ac["name"], ac["frequency"], ac["interval_seconds"], ac["period_minutes"])
 
     # Create persistent agent instances (conversation history is preserved across runs)
-    agents_by_name = {ac["name"]: ac for ac in agents_config}
+    intervals = {ac["name"]: ac["interval_seconds"] for ac in agents_config}
+    periods = {ac["name"]: ac["period_minutes"] for ac in agents_config}
     agent_instances: dict[str, Agent] = {}
 
     for ac in agents_config:
-        result = create_agent(ac["name"], agents_dir, ac["period_minutes"], sessions_dir)
+        result = create_agent(ac["name"], ac["period_minutes"], config)
         if result is None:
             logger.warning("Skipping agent '%s' due to load failure.", ac["name"])
             continue
@@ -418,64 +736,99 @@ def main():
     # Create per-agent loggers with daily file rotation
     agent_loggers: dict[str, logging.Logger] = {}
     for name in agent_instances:
-        agent_loggers[name] = setup_agent_logger(name, log_dir)
+        agent_loggers[name] = setup_agent_logger(name, config.log_dir)
 
     # Start webhook server
-    webhook_port = int(os.getenv("SNAKE_WEBHOOK_PORT", "8000"))
-    webhook_q: queue.Queue[str] = queue.Queue()
-    webhook_server = start_webhook_server(webhook_port, set(agent_instances.keys()), webhook_q)
-
-    # Initialize schedule — only for agents with interval-based frequencies
-    now = time.time()
-    schedule = {
-        name: now for name in agent_instances
-        if agents_by_name[name]["interval_seconds"] is not None
-    }
+    webhook_server = start_webhook_server(config.webhook_port, set(agent_instances.keys()), webhook_queue)
+
+    # Agents run on a thread pool so slow runs don't block each other
+    executor = ThreadPoolExecutor(max_workers=config.max_concurrent_agents, thread_name_prefix="agent")
+    in_flight: dict[str, Future] = {}
+    # Webhook-triggered agents waiting for their current run to finish
+    deferred: set[str] = set()
+
+    # Initialize schedule — only for agents with interval-based frequencies.
+    # A min-heap of (run_at, name) keeps the next due agent at index 0.
+    # Run times are time.monotonic() values, so clock changes don't shift them.
+    now = time.monotonic()
+    schedule: list[tuple[float, str]] = [
+        (now, name) for name in agent_instances
+        if intervals[name] is not None
+    ]
+    heapq.heapify(schedule)
+
+    # Last (run_at, name) announced, so wakeups don't repeat the same line
+    last_announced: tuple[float, str] | None = None
 
     while not shutdown_requested:
-        # Drain webhook queue — run triggered agents immediately
-        while not webhook_q.empty() and not shutdown_requested:
+        # Block until a webhook arrives or the next scheduled run is due
+        if schedule:
+            next_run, next_agent = schedule[0]
+            timeout = max(0, next_run - time.monotonic())
+            if timeout > 0 and schedule[0] != last_announced:
+                last_announced = schedule[0]
+                logger.info("Next up: '%s' at %s", next_agent,
+                            time.strftime(LOG_DATE_FORMAT, time.localtime(time.time() + timeout)))
+        else:
+            # No scheduled agents — just wait for webhooks
+            timeout = None
+
+        try:
+            agent_name = webhook_queue.get(timeout=timeout)
+        except queue.Empty:
+            agent_name = None
+
+        # Drain any other triggers that arrived in the meantime
+        triggered = [agent_name] if agent_name is not None else []
+        while True:
             try:
-                agent_name = webhook_q.get_nowait()
+                agent_name = webhook_queue.get(block=False)
             except queue.Empty:
                 break
-            if agent_name in agent_instances:
-                ac = agents_by_name[agent_name]
-                logger.info("Webhook triggered agent '%s'", agent_name)
-                run_agent(agent_instances[agent_name], agent_name, agents_dir, ac["period_minutes"], log_dir, agent_loggers)
-
-            if shutdown_requested:
-                break
+            if agent_name is not None:
+                triggered.append(agent_name)
 
         if shutdown_requested:
             break
 
-        # Check scheduled agents
-        if schedule:
-            next_agent = min(schedule, key=schedule.get)
-            next_run = schedule[next_agent]
-
-            if time.time() >= next_run:
-                # Run all agents that are due
-                now = time.time()
-                for name, run_at in sorted(schedule.items(), key=lambda x: x[1]):
-                    if shutdown_requested:
-                        break
-                    if run_at > now:
-                        break
-                    ac = agents_by_name[name]
-                    run_agent(agent_instances[name], name, agents_dir, ac["period_minutes"], log_dir, agent_loggers)
-                    schedule[name] = time.time() + ac["interval_seconds"]
-            else:
-                next_run_time = datetime.fromtimestamp(next_run)
-                logger.info("Next up: '%s' at %s", next_agent, next_run_time.isoformat())
-                while not shutdown_requested and time.time() < next_run and webhook_q.empty():
-                    time.sleep(1)
-        else:
-            # No scheduled agents — just wait for webhooks
-            time.sleep(1)
+        # Collect this tick's runs, deduplicated by agent: webhook triggers
+        # (including ones deferred while the agent was running) come first,
+        # then due scheduled agents that a webhook hasn't already covered.
+        to_run: dict[str, str] = dict.fromkeys(deferred, "webhook")
+        deferred.clear()
+        for name in triggered:
+            if name in agent_instances:
+                logger.info("Webhook triggered agent '%s'", name)
+                to_run[name] = "webhook"
+
+        # Reschedule due agents before running them, so a trigger during
+        # the run doesn't make the next interval fire back-to-back
+        now = time.monotonic()
+        due = []
+        while schedule and schedule[0][0] <= now:
+            due.append(heapq.heappop(schedule)[1])
+        for name in due:
+            heapq.heappush(schedule, (now + intervals[name], name))
+            to_run.setdefault(name, "scheduled")
+
+        for name, reason in to_run.items():
+            if submit_agent(executor, in_flight, agent_instances[name], name,
+                            periods[name], config, agent_loggers):
+                continue
+            if reason == "scheduled":
+                logger.info("Agent '%s' is still running, skipping scheduled run", name)
+                continue
+            # Triggers that arrive while an agent is running collapse into
+            # a single re-run once it completes
+            if name in triggered:
+                logger.info("Agent '%s' is still running, will re-run when it completes", name)
+            deferred.add(name)
 
     webhook_server.shutdown()
+    if any(not f.done() for f in in_flight.values()):
+        logger.info("Waiting for running agents to finish...")
+    executor.shutdown(wait=True, cancel_futures=True)
+    stop_agent_loggers()
     logger.info("Snake stopped.")
     return 0
 
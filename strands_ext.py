@@ -0,0 +1,91 @@
+from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.hooks import AfterToolCallEvent, HookRegistry
+from strands.models.anthropic import AnthropicModel
+
+# Rough characters-per-token ratio used to size tool output limits
+CHARS_PER_TOKEN = 4
+
+
+class SnakeConversationManager(SlidingWindowConversationManager):
+    """Sliding window conversation manager that keeps tool output bounded.
+
+    Tool results longer than max_tool_output_tokens are cut down to their head
+    and tail as soon as the tool returns, before the model ever sees them.
+
+    History is trimmed in steps: it may grow to twice the window size and is
+    then cut back to the window size. Between trims, the message prefix sent
+    to the model stays the same, so prompt caching keeps hitting instead of
+    being invalidated by a window that shifts on every run.
+    """
+
+    def __init__(self, window_size: int, max_tool_output_tokens: int):
+        # Tool output is already bounded by _truncate_tool_result. The base
+        # class would otherwise make reduce_context() blank out the newest tool
+        # result and return without trimming, so history would never shrink.
+        super().__init__(window_size=window_size, should_truncate_results=False)
+        self.max_tool_output_chars = max_tool_output_tokens * CHARS_PER_TOKEN
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(AfterToolCallEvent, self._truncate_tool_result)
+
+    def _truncate_tool_result(self, event: AfterToolCallEvent) -> None:
+        limit = self.max_tool_output_chars
+        if limit <= 0:
+            return
+        content = event.result.get("content", [])
+        if not any(len(block.get("text", "")) > limit for block in content):
+            return
+
+        truncated = []
+        for block in content:
+            text = block.get("text")
+            if text is not None and len(text) > limit:
+                elided_tokens = (len(text) - limit) // CHARS_PER_TOKEN
+                half = limit // 2
+                block = {"text": f"{text[:half]}\n[...{elided_tokens} tokens elided...]\n{text[-half:]}"}
+            truncated.append(block)
+        event.result = {**event.result, "content": truncated}
+
+    def apply_management(self, agent: Agent, **kwargs) -> None:
+        if len(agent.messages) <= self.window_size * 2:
+            return
+        self.reduce_context(agent)
+
+    def restore_from_session(self, state: dict) -> list | None:
+        # Sessions saved before this class existed carry the base class name
+        if state.get("__name__") == SlidingWindowConversationManager.__name__:
+            state = {**state, "__name__": self.__class__.__name__}
+        return super().restore_from_session(state)
+
+
+class CachingAnthropicModel(AnthropicModel):
+    """AnthropicModel that marks the tool schemas, system prompt and history as cacheable.
+
+    Tools and system prompt are identical from one request to the next, and
+    each request repeats the previous conversation plus the newest messages.
+    With cache_control breakpoints on all three, Anthropic serves the
+    repeated prefix from its prompt cache instead of re-processing (and
+    re-billing) it on every model call.
+    """
+
+    # Block types Anthropic accepts a cache_control breakpoint on
+    _CACHEABLE_BLOCK_TYPES = frozenset({"text", "tool_result", "tool_use", "image", "document"})
+
+    def format_request(self, *args, **kwargs) -> dict:
+        request = super().format_request(*args, **kwargs)
+        if request.get("tools"):
+            request["tools"][-1]["cache_control"] = {"type": "ephemeral"}
+        if isinstance(request.get("system"), str):
+            request["system"] = [
+                {"type": "text", "text": request["system"], "cache_control": {"type": "ephemeral"}},
+            ]
+        # A breakpoint on the newest block caches the whole conversation up to
+        # it, so the next call (a tool round or the next run) reads it back
+        messages = request.get("messages")
+        if messages and messages[-1].get("content"):
+            last_block = messages[-1]["content"][-1]
+            if last_block.get("type") in self._CACHEABLE_BLOCK_TYPES:
+                last_block["cache_control"] = {"type": "ephemeral"}
+        return request
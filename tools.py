@@ -1,14 +1,213 @@
+import io
 import os
+import threading
+import time
 import unicodedata
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 
-import markdown
-import requests
 from strands import tool
 
+if TYPE_CHECKING:
+    import markdown
+    import requests
+
+# orjson encodes and parses several times faster than the stdlib, which
+# matters for large OpenSearch responses; it is optional and json is used
+# when it isn't installed
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# Shared HTTP session, created on first use, so OpenSearch, Discord and
+# chat API calls reuse keep-alive connections
+_session: "requests.Session | None" = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """Return the shared HTTP session, creating it on first use.
+
+    requests is imported here rather than at module level, so loading the
+    tools doesn't pay for it until one makes a request.
+
+    The pool is sized for several agents running tool calls at once.
+    Transient errors are retried for idempotent requests only; POSTs (alerts,
+    chat messages, scroll continuations) are never sent twice.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                adapter = HTTPAdapter(
+                    pool_connections=8,
+                    pool_maxsize=32,
+                    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+# Hits fetched per OpenSearch scroll page, and how long the scroll context
+# is kept alive between pages
+OPENSEARCH_SCROLL_SIZE = 1000
+OPENSEARCH_SCROLL_TIMEOUT = "1m"
+
+# Only the fields read from each hit, plus the scroll id, are returned
+_SOURCE_FIELDS = ["@timestamp", "log"]
+_FILTER_PATH = "_scroll_id,hits.hits._source"
+# For _msearch; status keeps every response in the array, even one without
+# hits, so results stay aligned with their queries
+_MSEARCH_FILTER_PATH = "responses.status,responses.error,responses.hits.hits._source"
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@dataclass(frozen=True)
+class OpenSearchConfig:
+    """OpenSearch connection settings, read from the environment."""
+
+    search_url: str
+    scroll_url: str
+    msearch_url: str
+    auth: tuple[str, str]
+    result_size: int
+
+
+@lru_cache(maxsize=1)
+def _opensearch_config() -> OpenSearchConfig:
+    """Read the OPENSEARCH_* environment variables once.
+
+    Call _opensearch_config.cache_clear() to pick up environment changes.
+
+    Raises ValueError if a required variable is missing or
+    OPENSEARCH_RESULT_SIZE is not a number.
+    """
+    host = os.environ.get("OPENSEARCH_HOST")
+    port = os.environ.get("OPENSEARCH_PORT", "9200")
+    user = os.environ.get("OPENSEARCH_USER")
+    password = os.environ.get("OPENSEARCH_PASSWORD")
+    index = os.environ.get("OPENSEARCH_INDEX")
+
+    if not host or not user or not password or not index:
+        raise ValueError("OPENSEARCH_HOST, OPENSEARCH_USER, OPENSEARCH_PASSWORD, and OPENSEARCH_INDEX environment variables must be set")
+
+    base_url = f"http://{host}:{port}"
+    return OpenSearchConfig(
+        search_url=f"{base_url}/{index}/_search",
+        scroll_url=f"{base_url}/_search/scroll",
+        msearch_url=f"{base_url}/{index}/_msearch",
+        auth=(user, password),
+        result_size=int(os.environ.get("OPENSEARCH_RESULT_SIZE", "10000")),
+    )
+
+
+def _clear_scroll(config: OpenSearchConfig, scroll_id: str) -> None:
+    """Release an OpenSearch scroll context.
+
+    Failures are ignored; the context expires on its own after
+    OPENSEARCH_SCROLL_TIMEOUT.
+    """
+    import requests
+
+    try:
+        _get_session().delete(config.scroll_url, headers=_JSON_HEADERS, auth=config.auth, json={"scroll_id": scroll_id})
+    except requests.RequestException:
+        pass
+
+
+def _build_log_query(hours: int, include: list[str] | None, exclude: list[str] | None, size: int) -> dict:
+    """Build the search body for the logs of the last `hours` hours, newest first."""
+    # Results are sorted by timestamp, so every clause runs in filter context
+    # and OpenSearch skips scoring entirely
+    filter_clauses = [
+        {"range": {"@timestamp": {"gte": f"now-{hours}h", "lte": "now"}}}
+    ]
+
+    # Include filter: log must contain at least one of the terms
+    if include:
+        filter_clauses.append({"bool": {
+            "should": [{"match_phrase": {"log": term}} for term in include],
+            "minimum_should_match": 1,
+        }})
+
+    bool_query = {"filter": filter_clauses}
+
+    # Exclude filter: log must not contain any of the terms
+    if exclude:
+        bool_query["must_not"] = [{"match_phrase": {"log": term}} for term in exclude]
+
+    return {
+        "query": {"bool": bool_query},
+        "sort": [{"@timestamp": {"order": "desc"}}],
+        "size": size,
+        "_source": _SOURCE_FIELDS,
+    }
+
+
+def _format_hits(hits: list[dict]) -> str:
+    """Format search hits as "[timestamp] log" lines."""
+    try:
+        return "\n".join("[%s] %s" % (hit["_source"]["@timestamp"], hit["_source"]["log"]) for hit in hits)
+    except KeyError:
+        # Rare: a document without one of the fields; fill in placeholders
+        sources = (hit.get("_source", {}) for hit in hits)
+        return "\n".join(
+            "[%s] %s" % (source.get("@timestamp", "unknown"), source.get("log", ""))
+            for source in sources
+        )
+
+
+# get_rust_server_logs results for the current agent run, so an agent
+# repeating a query within a run doesn't fetch the same logs again. main.py
+# sets a fresh dict around each run; outside a run (None) nothing is cached,
+# so a new run always sees new logs.
+LOG_CACHE_TTL_SECONDS = 30
+LOG_CACHE_MAX_ENTRIES = 16
+current_log_cache: ContextVar[dict[tuple, tuple[float, str]] | None] = ContextVar("current_log_cache", default=None)
+# Tool calls within a run can execute concurrently and share the run's cache
+_log_cache_lock = threading.Lock()
+
+
+def _get_cached_logs(key: tuple) -> str | None:
+    """Return a log result cached in this run if it is younger than LOG_CACHE_TTL_SECONDS."""
+    cache = current_log_cache.get()
+    if cache is None:
+        return None
+    entry = cache.get(key)
+    if entry is None or time.monotonic() - entry[0] > LOG_CACHE_TTL_SECONDS:
+        return None
+    return entry[1]
+
+
+def _cache_logs(key: tuple, result: str) -> None:
+    """Store a log result for this run, dropping the oldest entries past LOG_CACHE_MAX_ENTRIES."""
+    cache = current_log_cache.get()
+    if cache is None:
+        return
+    with _log_cache_lock:
+        cache.pop(key, None)
+        cache[key] = (time.monotonic(), result)
+        while len(cache) > LOG_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+
 
 @tool
-def get_rust_server_logs(hours: int = 24, include: list[str] = None, exclude: list[str] = None) -> str:
+def get_rust_server_logs(hours: int = 24, include: list[str] = None, exclude: list[str] = None,
+                         fresh: bool = False) -> str:
     """
     Fetch logs from the Rust game server via OpenSearch.
 
@@ -23,71 +222,142 @@ def get_rust_server_logs(hours: int = 24, include: list[str] = None, exclude: li
             least one of these terms will be returned. Example: ["[Global]", "[Better Say]"]
         exclude: Optional list of terms to exclude. Logs containing any of
             these terms will be filtered out. Example: ["[Team]"]
+        fresh: Set to true to bypass the cache. Otherwise, repeating an
+            identical query within 30 seconds in the same run returns the
+            same result.
 
     Returns:
         Server logs with timestamps, useful for admin oversight
     """
-    opensearch_host = os.environ.get("OPENSEARCH_HOST")
-    opensearch_port = os.environ.get("OPENSEARCH_PORT", "9200")
-    opensearch_user = os.environ.get("OPENSEARCH_USER")
-    opensearch_password = os.environ.get("OPENSEARCH_PASSWORD")
-    opensearch_index = os.environ.get("OPENSEARCH_INDEX")
-    opensearch_result_size = int(os.environ.get("OPENSEARCH_RESULT_SIZE", "10000"))
-
-    if not opensearch_host or not opensearch_user or not opensearch_password or not opensearch_index:
-        return "Error: OPENSEARCH_HOST, OPENSEARCH_USER, OPENSEARCH_PASSWORD, and OPENSEARCH_INDEX environment variables must be set"
-
-    url = f"http://{opensearch_host}:{opensearch_port}/{opensearch_index}/_search"
-    headers = {"Content-Type": "application/json"}
-    auth = (opensearch_user, opensearch_password)
-
-    # Build the bool query with time range as a must clause
-    must_clauses = [
-        {"range": {"@timestamp": {"gte": f"now-{hours}h", "lte": "now"}}}
-    ]
+    try:
+        config = _opensearch_config()
+    except ValueError as e:
+        return f"Error: {e}"
+
+    cache_key = (hours, tuple(sorted(include or ())), tuple(sorted(exclude or ())))
+    if not fresh:
+        cached = _get_cached_logs(cache_key)
+        if cached is not None:
+            return cached
+
+    page_size = min(OPENSEARCH_SCROLL_SIZE, config.result_size)
+    query = _build_log_query(hours, include, exclude, page_size)
+
+    # Page through the results with the scroll API so only one batch of hits
+    # is held in memory at a time
+    response = _get_session().get(
+        config.search_url,
+        params={"scroll": OPENSEARCH_SCROLL_TIMEOUT, "filter_path": _FILTER_PATH},
+        headers=_JSON_HEADERS,
+        auth=config.auth,
+        data=_json.dumps(query),
+    )
+    response.raise_for_status()
 
-    # Include filter: log must contain at least one of the terms
-    should_clauses = []
-    if include:
-        for term in include:
-            should_clauses.append({"match_phrase": {"log": term}})
+    data = _json.loads(response.content)
+    scroll_id = data.get("_scroll_id")
+    hits = data.get("hits", {}).get("hits", [])
 
-    # Exclude filter: log must not contain any of the terms
-    must_not_clauses = []
-    if exclude:
-        for term in exclude:
-            must_not_clauses.append({"match_phrase": {"log": term}})
+    output = io.StringIO()
+    remaining = config.result_size
+    try:
+        while hits:
+            # One join and one write per page rather than per hit
+            if output.tell():
+                output.write("\n")
+            output.write(_format_hits(hits[:remaining]))
+
+            remaining -= len(hits)
+            if remaining <= 0 or len(hits) < page_size or not scroll_id:
+                break
+
+            # POST, not GET: the session retries GETs, and a retried scroll
+            # request could skip a page if the cursor had already advanced
+            response = _get_session().post(
+                config.scroll_url,
+                params={"filter_path": _FILTER_PATH},
+                headers=_JSON_HEADERS,
+                auth=config.auth,
+                data=_json.dumps({"scroll": OPENSEARCH_SCROLL_TIMEOUT, "scroll_id": scroll_id}),
+            )
+            response.raise_for_status()
+
+            data = _json.loads(response.content)
+            scroll_id = data.get("_scroll_id", scroll_id)
+            hits = data.get("hits", {}).get("hits", [])
+    finally:
+        if scroll_id:
+            _clear_scroll(config, scroll_id)
+
+    result = output.getvalue() or "No logs found in the specified time range."
+    _cache_logs(cache_key, result)
+    return result
 
-    bool_query = {"must": must_clauses}
-    if should_clauses:
-        bool_query["should"] = should_clauses
-        bool_query["minimum_should_match"] = 1
-    if must_not_clauses:
-        bool_query["must_not"] = must_not_clauses
 
-    query = {
-        "query": {"bool": bool_query},
-        "sort": [{"@timestamp": {"order": "desc"}}],
-        "size": opensearch_result_size
-    }
+@tool
+def get_rust_server_logs_batch(queries: list[dict]) -> str:
+    """
+    Fetch several filtered views of the Rust server logs in a single request.
 
-    response = requests.get(url, headers=headers, auth=auth, json=query)
-    response.raise_for_status()
+    Prefer this over calling get_rust_server_logs several times in a row when
+    you need logs for different filters or time windows (e.g. global chat for
+    the last 24 hours and kill events for the last hour).
 
-    data = response.json()
-    hits = data.get("hits", {}).get("hits", [])
+    Each query returns at most the 1000 most recent matching logs. Use
+    get_rust_server_logs for a single query that needs more.
 
-    if not hits:
-        return "No logs found in the specified time range."
+    Args:
+        queries: List of queries. Each is a dict with the same optional keys
+            as get_rust_server_logs: "hours" (default: 24), "include" and
+            "exclude" (lists of terms).
+            Example: [{"include": ["[Global]"]}, {"hours": 1, "include": ["was killed by"]}]
 
-    messages = []
-    for hit in hits:
-        source = hit.get("_source", {})
-        timestamp = source.get("@timestamp", "unknown")
-        log = source.get("log", "")
-        messages.append(f"[{timestamp}] {log}")
+    Returns:
+        The logs for each query, in order, each under a "## Query N" heading
+    """
+    try:
+        config = _opensearch_config()
+    except ValueError as e:
+        return f"Error: {e}"
+
+    if not queries:
+        return "Error: At least one query is required"
+
+    # _msearch can't scroll, so each query is capped at one scroll page to
+    # keep the combined response bounded
+    page_size = min(OPENSEARCH_SCROLL_SIZE, config.result_size)
+
+    # _msearch takes newline-delimited JSON: a header line (empty, as the
+    # index is in the URL) followed by the search body, for each query
+    lines = []
+    for q in queries:
+        body = _build_log_query(q.get("hours", 24), q.get("include"), q.get("exclude"), page_size)
+        for item in ({}, body):
+            line = _json.dumps(item)
+            lines.append(line if isinstance(line, bytes) else line.encode())
+    lines.append(b"")
+
+    response = _get_session().post(
+        config.msearch_url,
+        params={"filter_path": _MSEARCH_FILTER_PATH},
+        headers={"Content-Type": "application/x-ndjson"},
+        auth=config.auth,
+        data=b"\n".join(lines),
+    )
+    response.raise_for_status()
+
+    sections = []
+    for i, result in enumerate(_json.loads(response.content).get("responses", []), 1):
+        if "error" in result:
+            error = result["error"]
+            reason = error.get("reason", error) if isinstance(error, dict) else error
+            text = f"Error: {reason}"
+        else:
+            hits = result.get("hits", {}).get("hits", [])
+            text = _format_hits(hits) if hits else "No logs found in the specified time range."
+        sections.append(f"## Query {i}\n{text}")
 
-    return "\n".join(messages)
+    return "\n\n".join(sections)
 
 
 @tool
@@ -112,7 +382,7 @@ def post_discord_admin_alert(message: str) -> str:
         return "Error: DISCORD_RUST_ADMIN_WEBHOOK environment variable not set"
 
     payload = {"content": message}
-    response = requests.post(webhook_url, json=payload)
+    response = _get_session().post(webhook_url, headers=_JSON_HEADERS, data=_json.dumps(payload))
 
     if response.status_code == 204:
         return "Alert posted to Discord successfully"
@@ -120,79 +390,127 @@ def post_discord_admin_alert(message: str) -> str:
         return f"Failed to post to Discord: {response.status_code} - {response.text}"
 
 
-@tool
-def save_report_html(report_markdown: str, filename: str = None) -> str:
-    """
-    Save the analysis report as a rendered HTML file.
-
-    Args:
-        report_markdown: The report content in markdown format
-        filename: Optional filename (without extension). Defaults to timestamp-based name.
-
-    Returns:
-        Path to the saved HTML file or error message
-    """
-    output_dir = os.getenv("SNAKE_REPORT_DIR", os.getenv("REPORT_OUTPUT_DIR", "./reports"))
-    os.makedirs(output_dir, exist_ok=True)
-
-    if not filename:
-        filename = f"rust-server-report-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-
-    html_content = markdown.markdown(
-        report_markdown,
-        extensions=["tables", "fenced_code", "nl2br"]
-    )
-
-    full_html = f"""<!DOCTYPE html>
+# Static page around the rendered report, split where the title and
+# generation timestamps go
+_HTML_PREFIX = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Rust Server Report - {datetime.now().strftime('%Y-%m-%d %H:%M')}</title>
+    <title>Rust Server Report - """
+_HTML_AFTER_TITLE = """</title>
     <style>
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
             max-width: 900px;
             margin: 0 auto;
             padding: 20px;
             background: #1a1a1a;
             color: #e0e0e0;
-        }}
-        h1, h2, h3 {{ color: #ff6b35; }}
-        code {{
+        }
+        h1, h2, h3 { color: #ff6b35; }
+        code {
             background: #2d2d2d;
             padding: 2px 6px;
             border-radius: 3px;
-        }}
-        pre {{
+        }
+        pre {
             background: #2d2d2d;
             padding: 15px;
             border-radius: 5px;
             overflow-x: auto;
-        }}
-        table {{
+        }
+        table {
             border-collapse: collapse;
             width: 100%;
             margin: 15px 0;
-        }}
-        th, td {{
+        }
+        th, td {
             border: 1px solid #444;
             padding: 10px;
             text-align: left;
-        }}
-        th {{ background: #2d2d2d; }}
-        .timestamp {{ color: #888; font-size: 0.9em; }}
+        }
+        th { background: #2d2d2d; }
+        .timestamp { color: #888; font-size: 0.9em; }
     </style>
 </head>
 <body>
-    <div class="timestamp">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-    {html_content}
+    <div class="timestamp">Generated: """
+_HTML_AFTER_TIMESTAMP = """</div>
+"""
+_HTML_SUFFIX = """
 </body>
 </html>"""
 
+# Markdown instances keep their compiled extensions between conversions, but
+# are not thread-safe, so concurrent agents take turns with the shared one.
+# It is created on first use, as importing markdown loads all its extensions.
+_markdown: "markdown.Markdown | None" = None
+_markdown_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def _render_markdown(text: str) -> str:
+    """Convert report markdown to HTML.
+
+    Results are cached, so saving the same report again (a retry, or the
+    same content under another filename) skips the conversion. The cache is
+    kept small since it holds whole reports.
+    """
+    global _markdown
+    with _markdown_lock:
+        if _markdown is None:
+            import markdown
+            _markdown = markdown.Markdown(extensions=["tables", "fenced_code", "nl2br"], output_format="html5")
+        return _markdown.reset().convert(text)
+
+
+@tool
+def save_report_html(report_markdown: str, filename: str = None) -> str:
+    """
+    Save the analysis report as a rendered HTML file.
+
+    Args:
+        report_markdown: The report content in markdown format
+        filename: Optional filename (without extension). Defaults to timestamp-based name.
+
+    Returns:
+        Path to the saved HTML file or error message
+    """
+    output_dir = os.getenv("SNAKE_REPORT_DIR", os.getenv("REPORT_OUTPUT_DIR", "./reports"))
+    os.makedirs(output_dir, exist_ok=True)
+
+    now = datetime.now()
+    if not filename:
+        filename = f"rust-server-report-{now.strftime('%Y%m%d-%H%M%S')}"
+
+    html_content = _render_markdown(report_markdown)
+
+    full_html = "".join([
+        _HTML_PREFIX,
+        now.strftime('%Y-%m-%d %H:%M'),
+        _HTML_AFTER_TITLE,
+        now.strftime('%Y-%m-%d %H:%M:%S'),
+        _HTML_AFTER_TIMESTAMP,
+        html_content,
+        _HTML_SUFFIX,
+    ])
+
+    # Write to a temporary file and rename it into place, so a crash never
+    # leaves a half-written report. The name is unique per thread in case
+    # two agents save the same filename at once.
     filepath = os.path.join(output_dir, f"{filename}.html")
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(full_html)
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(full_html.encode("utf-8"))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
     return f"Report saved to: {filepath}"
 
@@ -208,6 +526,8 @@ def _transliterate_to_ascii(text: str) -> str:
     base forms (e.g. é→e, ã→a, ç→c) and drops any remaining non-ASCII
     characters that have no sensible ASCII mapping.
     """
+    if text.isascii():
+        return text
     # Decompose unicode characters (e.g. é → e + combining accent)
     # then drop the combining marks, keeping only the base characters
     nfkd = unicodedata.normalize("NFKD", text)
@@ -240,7 +560,7 @@ def send_global_chat_message(message: str) -> str:
     if not endpoint:
         return "Error: SNAKE_CHAT_API_ENDPOINT environment variable not set"
 
-    if not message or not message.strip():
+    if not message or message.isspace():
         return "Error: Message cannot be empty"
 
     if "\n" in message or "\r" in message:
@@ -252,7 +572,7 @@ def send_global_chat_message(message: str) -> str:
     if len(message) > MAX_CHAT_MESSAGE_LENGTH:
         return f"Error: Message exceeds {MAX_CHAT_MESSAGE_LENGTH} character limit ({len(message)} chars). Shorten the message and try again."
 
-    response = requests.post(endpoint, json={"message": message})
+    response = _get_session().post(endpoint, headers=_JSON_HEADERS, data=_json.dumps({"message": message}))
 
     if response.ok:
         return "Message sent to Global chat successfully"
@@ -260,9 +580,11 @@ def send_global_chat_message(message: str) -> str:
         return f"Failed to send chat message: {response.status_code} - {response.text}"
 
 
-TOOL_REGISTRY = {
+# Read-only view, so agent loading can't change the set of tools by accident
+TOOL_REGISTRY = MappingProxyType({
     "get_rust_server_logs": get_rust_server_logs,
+    "get_rust_server_logs_batch": get_rust_server_logs_batch,
     "post_discord_admin_alert": post_discord_admin_alert,
     "save_report_html": save_report_html,
     "send_global_chat_message": send_global_chat_message,
-}
+})